@@ -63,13 +63,14 @@ class TokenizerPermutationMergeTask(Task[torch.Tensor]):
 
             xp = torch.zeros((len(p), x.shape[-1]), dtype=x.dtype, device=x.device)
             mask = torch.zeros((len(p),), dtype=torch.bool, device=x.device)
-            for out_idx in p:
-                in_idx = p[out_idx]
-                if in_idx < 0:
-                    continue
 
-                xp[out_idx, :] = x[in_idx, :]
-                mask[out_idx] = 1
+            out_indices = [out_idx for out_idx in p if p[out_idx] >= 0]
+            in_indices = [p[out_idx] for out_idx in out_indices]
+            out_indices = torch.tensor(out_indices, dtype=torch.long, device=x.device)
+            in_indices = torch.tensor(in_indices, dtype=torch.long, device=x.device)
+
+            xp[out_indices, :] = x[in_indices, :]
+            mask[out_indices] = 1
 
             expanded.append(xp)
             masks.append(mask)